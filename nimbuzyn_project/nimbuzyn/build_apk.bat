@@ -58,7 +58,7 @@ if "%ANDROID_NDK_HOME%"=="" (
 echo [OK] NDK: %ANDROID_NDK_HOME%
 
 :: Generar iconos
-python generate_icons.py . 2>nul || echo [WARN] Python/Pillow no disponible, usando iconos existentes
+python generate_icons.py . --release 2>nul || echo [WARN] Python/Pillow no disponible, usando iconos existentes
 
 :: Compilar
 echo.
@@ -120,7 +120,9 @@ ok "NDK: $ANDROID_NDK_HOME"
 # ── 5. Generar iconos (Python) ────────────────────────────────────────────────
 log "Generando iconos 3D..."
 if command -v python3 &>/dev/null && python3 -c "import PIL" 2>/dev/null; then
-    python3 generate_icons.py "$(pwd)"
+    ICON_FLAGS=""
+    if [[ "$BUILD_TYPE" == "release" ]]; then ICON_FLAGS="--release"; fi
+    python3 generate_icons.py "$(pwd)" $ICON_FLAGS
     ok "Iconos generados"
 else
     warn "Python3 + Pillow no disponibles. Usando iconos existentes."
@@ -4,60 +4,121 @@ Nimbuzyn Icon Generator
 Generates a 3D orange 'N' logo on a dark background in all Android mipmap sizes.
 """
 
-import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFilter
 import numpy as np
 
-def draw_3d_N_icon(size: int, with_shadow: bool = True) -> Image.Image:
-    """Draw the Nimbuzyn icon: 3D orange N on deep dark background."""
+
+@lru_cache(maxsize=None)
+def rounded_rect_sdf(size: int, pad: int, radius: int) -> np.ndarray:
+    """Signed distance (px) to a rounded square inset by `pad`; negative inside."""
+    yy, xx = np.indices((size, size))
+    inner = size / 2 - pad - radius
+    qx = np.abs(xx + 0.5 - size / 2) - inner
+    qy = np.abs(yy + 0.5 - size / 2) - inner
+    sdf = (np.hypot(np.maximum(qx, 0), np.maximum(qy, 0))
+           + np.minimum(np.maximum(qx, qy), 0) - radius)
+    sdf.setflags(write=False)
+    return sdf
+
+
+@lru_cache(maxsize=None)
+def rounded_mask(size: int, pad: int, radius: int) -> np.ndarray:
+    """0/255 uint8 mask of the rounded square used for the icon background."""
+    mask = (rounded_rect_sdf(size, pad, radius) <= 0).astype(np.uint8) * 255
+    mask.setflags(write=False)
+    return mask
+
+
+@lru_cache(maxsize=None)
+def circle_mask(size: int) -> np.ndarray:
+    """0-255 uint8 mask of the circle inscribed in a size×size square (1px AA edge)."""
+    yy, xx = np.indices((size, size))
+    c = size / 2
+    dist = np.hypot(xx + 0.5 - c, yy + 0.5 - c)
+    mask = np.rint(np.clip(c - dist + 0.5, 0, 1) * 255).astype(np.uint8)
+    mask.setflags(write=False)
+    return mask
+
+
+SHADOW_MASTER_SIZE = 512
+
+
+@lru_cache(maxsize=None)
+def drop_shadow(size: int) -> np.ndarray:
+    """uint8 alpha of the icon's blurred drop shadow (the shadow itself is black).
+    
+    Only the 512px master is actually blurred; other sizes are bilinear
+    downsamples of it.
+    """
+    if size != SHADOW_MASTER_SIZE:
+        master = Image.fromarray(drop_shadow(SHADOW_MASTER_SIZE), "L")
+        return np.asarray(master.resize((size, size), Image.BILINEAR))
+    
+    pad = int(size * 0.04)
+    radius = int(size * 0.22)
+    blur_r = max(4, int(size * 0.05))
+    # Same rounded square as the background, offset 3px down-right
+    mask_arr = rounded_mask(size, pad, radius)
+    # (black, so only the alpha channel needs blurring)
+    shadow_a = np.zeros((size, size), np.uint8)
+    shadow_a[3:, 3:] = mask_arr[:-3, :-3] // 255 * 100
+    shadow = Image.fromarray(shadow_a, "L").filter(ImageFilter.GaussianBlur(blur_r))
+    return np.asarray(shadow)
+
+
+def radial_bg(buf: np.ndarray, cx: float, cy: float) -> None:
+    """Fill the RGB channels of `buf` with the navy radial gradient around (cx, cy)."""
+    h, w = buf.shape[:2]
+    yy, xx = np.ogrid[0:h, 0:w]
+    dx = (xx - cx).astype(np.float32)
+    dy = (yy - cy).astype(np.float32)
+    t = np.sqrt(dx * dx + dy * dy)
+    t *= np.float32(1 / max(cx, cy, 1))
+    np.minimum(t, 1, out=t)
+    # Dark navy to near-black
+    for ch, (base, span) in enumerate(((10, 18), (12, 16), (20, 28))):
+        buf[..., ch] = base + t * span
+
+
+def _render_icon(size: int, with_shadow: bool) -> Image.Image:
+    """Render the icon from scratch; see draw_3d_N_icon."""
     
     scale = size / 192
-    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
     
     # ── Background circle / rounded square ───────────────────────────────
     pad = int(size * 0.04)
     radius = int(size * 0.22)
     
-    # Deep dark gradient background
-    bg_layer = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    bg_draw = ImageDraw.Draw(bg_layer)
-    
-    # Draw gradient background using circles from center
-    cx, cy = size // 2, size // 2
-    for r in range(max(cx, cy), 0, -1):
-        t = r / max(cx, cy)
-        # Dark navy to near-black
-        rc = int(10 + t * 18)
-        gc = int(12 + t * 16)
-        bc = int(20 + t * 28)
-        bg_draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=(rc, gc, bc, 255))
-    
-    # Clip to rounded rectangle
-    mask = Image.new("L", (size, size), 0)
-    mask_draw = ImageDraw.Draw(mask)
-    mask_draw.rounded_rectangle([pad, pad, size - pad, size - pad], radius=radius, fill=255)
-    
-    bg_out = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    bg_out.paste(bg_layer, mask=mask)
-    img = Image.alpha_composite(img, bg_out)
-    draw = ImageDraw.Draw(img)
-    
-    # Subtle inner glow ring
-    ring_layer = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    ring_draw = ImageDraw.Draw(ring_layer)
-    for t_i in range(6):
-        t = t_i / 5
-        alpha = int(25 * (1 - t))
-        offset = int(t_i * 3 * scale)
-        ring_draw.rounded_rectangle(
-            [pad + offset, pad + offset, size - pad - offset, size - pad - offset],
-            radius=max(4, radius - offset),
-            outline=(255, 140, 0, alpha),
-            width=max(1, int(2 * scale)),
-        )
-    img = Image.alpha_composite(img, ring_layer)
-    draw = ImageDraw.Draw(img)
+    # Deep dark gradient background, radial from center. Clipped to the
+    # rounded rectangle: the gradient is opaque, so the mask is used
+    # directly as the background layer's alpha
+    mask_arr = rounded_mask(size, pad, radius)
+    bg_layer = np.empty((size, size, 4), np.uint8)
+    radial_bg(bg_layer, size // 2, size // 2)
+    bg_layer[..., 3] = mask_arr
+    
+    # ── Soft drop shadow (bottom-most layer) ──────────────────────────────
+    # Black, so it only contributes alpha. The background is opaque wherever
+    # the (binary) mask is set, so it replaces the shadow there instead of
+    # being blended over it
+    base = np.zeros((size, size, 4), np.uint8)
+    if with_shadow and size >= 48:
+        base[..., 3] = drop_shadow(size)
+    inside = mask_arr > 0
+    base[inside] = bg_layer[inside]
+    img = Image.fromarray(base, "RGBA")
+    
+    # Subtle inner glow ring: alpha falls off with the distance inside the
+    # rounded-rect edge, clipped to the background mask
+    sdf = rounded_rect_sdf(size, pad, radius)
+    glow = np.clip(25 * (1 + sdf / (18 * scale)), 0, 25)
+    glow[mask_arr == 0] = 0
+    ring = np.zeros((size, size, 4), np.uint8)
+    ring[..., :3] = (255, 140, 0)
+    ring[..., 3] = glow.astype(np.uint8)
+    img = Image.alpha_composite(img, Image.fromarray(ring, "RGBA"))
     
     # ── 3D "N" construction ───────────────────────────────────────────────
     # Letter dimensions
@@ -69,29 +130,30 @@ def draw_3d_N_icon(size: int, with_shadow: bool = True) -> Image.Image:
     stroke = int(letter_w * 0.22)   # stroke thickness
     depth  = int(size * 0.04)        # 3D extrusion depth
     
-    # Color palette
-    orange_top   = (255, 145, 20)    # bright face
-    orange_mid   = (230, 110, 5)     # slightly dimmer
-    orange_dark  = (180, 75, 0)      # shadow face (extrusion side)
-    orange_deep  = (120, 50, 0)      # deepest shadow
-    highlight    = (255, 200, 80)    # specular highlight
+    # Color palette (face colors as ready-made opaque RGBA fills)
+    orange_top   = (255, 145, 20, 255)    # bright face
+    orange_mid   = (230, 110, 5, 255)     # slightly dimmer
+    orange_dark  = (180, 75, 0, 255)      # shadow face (extrusion side)
+    orange_deep  = (120, 50, 0, 255)      # deepest shadow
+    highlight    = (255, 200, 80)         # specular highlight
     
-    def rect(draw, x0, y0, x1, y1, color, alpha=255):
-        c = color + (alpha,) if len(color) == 3 else color
-        draw.rectangle([x0, y0, x1, y1], fill=c)
+    def rect(draw, x0, y0, x1, y1, rgba):
+        draw.rectangle([x0, y0, x1, y1], fill=rgba)
     
-    def poly(draw, pts, color, alpha=255):
-        c = color + (alpha,) if len(color) == 3 else color
-        draw.polygon(pts, fill=c)
+    def poly(draw, pts, rgba):
+        draw.polygon(pts, fill=rgba)
+    
+    # The extrusion and the front face share one layer (later fills
+    # overwrite earlier ones), so the N costs a single composite
+    N_layer = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    n_draw = ImageDraw.Draw(N_layer)
     
     # ── Draw 3D extrusion first (back layer) ──────────────────────────────
-    N_layer_back = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    nb_draw = ImageDraw.Draw(N_layer_back)
     
     dx, dy = depth, depth  # extrusion direction (bottom-right)
     
     # Left vertical bar – right extrusion face
-    poly(nb_draw,
+    poly(n_draw,
          [(lx + stroke, ly + dy),
           (lx + stroke + dx, ly),
           (lx + stroke + dx, ly + letter_h),
@@ -99,13 +161,13 @@ def draw_3d_N_icon(size: int, with_shadow: bool = True) -> Image.Image:
          orange_dark)
     
     # Right vertical bar – right extrusion face
-    poly(nb_draw,
+    poly(n_draw,
          [(lx + letter_w - stroke, ly + dy),
           (lx + letter_w - stroke + dx, ly),
           (lx + letter_w + dx, ly),
           (lx + letter_w, ly + dy)],
          orange_dark)
-    poly(nb_draw,
+    poly(n_draw,
          [(lx + letter_w, ly + dy),
           (lx + letter_w + dx, ly),
           (lx + letter_w + dx, ly + letter_h),
@@ -118,14 +180,14 @@ def draw_3d_N_icon(size: int, with_shadow: bool = True) -> Image.Image:
     diag_x1 = lx + letter_w - stroke
     diag_y1 = ly + letter_h - int(stroke * 0.5)
     
-    poly(nb_draw,
+    poly(n_draw,
          [(diag_x0, diag_y0 + dy),
           (diag_x0 + dx, diag_y0),
           (diag_x0 + stroke + dx, diag_y0),
           (diag_x0 + stroke, diag_y0 + dy)],
          orange_deep)
     
-    poly(nb_draw,
+    poly(n_draw,
          [(diag_x1 - stroke, diag_y1 + dy),
           (diag_x1 - stroke + dx, diag_y1),
           (diag_x1 + dx, diag_y1),
@@ -133,16 +195,11 @@ def draw_3d_N_icon(size: int, with_shadow: bool = True) -> Image.Image:
          orange_deep)
     
     # Bottom extrusion of bars
-    rect(nb_draw, lx, ly + letter_h, lx + stroke + dx, ly + letter_h + dy, orange_dark)
-    rect(nb_draw, lx + letter_w - stroke, ly + letter_h,
+    rect(n_draw, lx, ly + letter_h, lx + stroke + dx, ly + letter_h + dy, orange_dark)
+    rect(n_draw, lx + letter_w - stroke, ly + letter_h,
          lx + letter_w + dx, ly + letter_h + dy, orange_dark)
     
-    img = Image.alpha_composite(img, N_layer_back)
-    
     # ── Draw front face of the N ───────────────────────────────────────────
-    N_layer = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    n_draw = ImageDraw.Draw(N_layer)
-    
     # Left vertical bar
     rect(n_draw, lx, ly, lx + stroke, ly + letter_h, orange_mid)
     
@@ -160,52 +217,87 @@ def draw_3d_N_icon(size: int, with_shadow: bool = True) -> Image.Image:
     poly(n_draw, diag_pts, orange_mid)
     
     img = Image.alpha_composite(img, N_layer)
-    draw = ImageDraw.Draw(img)
     
     # ── Highlights (specular) ─────────────────────────────────────────────
-    hl_layer = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    hl_draw = ImageDraw.Draw(hl_layer)
+    # Axis-aligned rectangles written straight into the layer (later ones
+    # overwrite earlier ones, like ImageDraw fills)
+    hl = np.zeros((size, size, 4), np.uint8)
     
     hl_w = max(2, int(stroke * 0.18))
     # Left bar top-left edge highlight
-    hl_draw.rectangle(
-        [lx, ly, lx + hl_w, ly + letter_h],
-        fill=highlight + (180,)
-    )
+    hl[ly:ly + letter_h + 1, lx:lx + hl_w + 1] = highlight + (180,)
     # Left bar top edge
-    hl_draw.rectangle(
-        [lx, ly, lx + stroke, ly + hl_w],
-        fill=highlight + (160,)
-    )
+    hl[ly:ly + hl_w + 1, lx:lx + stroke + 1] = highlight + (160,)
     # Right bar top edge
-    hl_draw.rectangle(
-        [lx + letter_w - stroke, ly, lx + letter_w, ly + hl_w],
-        fill=highlight + (130,)
-    )
+    hl[ly:ly + hl_w + 1, lx + letter_w - stroke:lx + letter_w + 1] = highlight + (130,)
     
-    img = Image.alpha_composite(img, hl_layer)
-    
-    # ── Soft drop shadow ──────────────────────────────────────────────────
-    if with_shadow and size >= 48:
-        shadow = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        sh_draw = ImageDraw.Draw(shadow)
-        blur_r = max(4, int(size * 0.05))
-        sh_draw.rounded_rectangle(
-            [pad + 3, pad + 3, size - pad + 3, size - pad + 3],
-            radius=radius,
-            fill=(0, 0, 0, 100)
-        )
-        shadow = shadow.filter(ImageFilter.GaussianBlur(blur_r))
-        base = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-        base = Image.alpha_composite(base, shadow)
-        base = Image.alpha_composite(base, img)
-        img = base
+    img = Image.alpha_composite(img, Image.fromarray(hl, "RGBA"))
     
     return img
 
 
-def generate_all_icons(base_path: str):
-    """Generate all required Android mipmap icon sizes."""
+@lru_cache(maxsize=16)
+def _cached_icon_bytes(size: int, with_shadow: bool):
+    """Render once per (size, with_shadow) and keep (mode, size, raw bytes)."""
+    im = _render_icon(size, with_shadow)
+    return im.mode, im.size, im.tobytes()
+
+
+def draw_3d_N_icon(size: int, with_shadow: bool = True) -> Image.Image:
+    """Draw the Nimbuzyn icon: 3D orange N on deep dark background.
+    
+    Renders are deterministic, so they are cached as raw bytes per
+    (size, with_shadow); every call returns a fresh, independent image.
+    """
+    mode, dims, data = _cached_icon_bytes(size, with_shadow)
+    return Image.frombytes(mode, dims, data)
+
+
+def _render_one(density: str, size: int, base_path: str,
+                master: Image.Image, png_opts: dict) -> str:
+    """Resample the master icon to one density and save square + round PNGs."""
+    icon = master.resize((size, size), Image.LANCZOS)
+    path = f"{base_path}/res/mipmap-{density}/ic_launcher.png"
+    icon.save(path, "PNG", **png_opts)
+    
+    # Round icon: circle clip multiplied into the existing alpha, so the
+    # transparent corners of the rounded square stay transparent
+    arr = np.asarray(icon)
+    round_a = (arr[..., 3].astype(np.uint16) * circle_mask(size) // 255).astype(np.uint8)
+    round_icon = Image.fromarray(np.dstack([arr[..., :3], round_a]), "RGBA")
+    round_path = f"{base_path}/res/mipmap-{density}/ic_launcher_round.png"
+    round_icon.save(round_path, "PNG", **png_opts)
+    return path
+
+
+def _render_feature_graphic(base_path: str, master: Image.Image, png_opts: dict) -> str:
+    """Compose and save the 1024x500 Play Store feature graphic."""
+    # Background gradient: one column of colors broadcast across the width
+    t = (np.arange(500, dtype=np.float32) / 500)[:, None]
+    r = (11 + t * 8).astype(np.uint8)
+    g = (14 + t * 6).astype(np.uint8)
+    b = (22 + t * 12).astype(np.uint8)
+    row = np.stack([r, g, b, np.full_like(r, 255)], axis=-1)
+    feature = Image.fromarray(np.broadcast_to(row, (500, 1024, 4)).copy(), "RGBA")
+    
+    # Place centered icon
+    icon_512 = master.resize((220, 220), Image.LANCZOS)
+    ix = (1024 - 220) // 2
+    iy = (500 - 220) // 2 - 20
+    feature.alpha_composite(icon_512, (ix, iy))
+    
+    path = f"{base_path}/assets/feature_graphic.png"
+    feature.save(path, "PNG", **png_opts)
+    return path
+
+
+def generate_all_icons(base_path: str, release: bool = False):
+    """Generate all required Android mipmap icon sizes.
+    
+    PNGs are written with fast zlib settings; pass `release=True` for the
+    fully optimized (slower, smaller) encoding used in shipping builds.
+    """
+    png_opts = {"optimize": True} if release else {"optimize": False, "compress_level": 1}
     sizes = {
         "mdpi":    48,
         "hdpi":    72,
@@ -215,59 +307,34 @@ def generate_all_icons(base_path: str):
     }
     
     print("Generando iconos Nimbuzyn…")
-    for density, size in sizes.items():
-        icon = draw_3d_N_icon(size)
-        path = f"{base_path}/res/mipmap-{density}/ic_launcher.png"
-        icon.save(path, "PNG", optimize=True)
-        
-        # Round icon (circle clip)
-        round_icon = icon.copy()
-        mask = Image.new("L", (size, size), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.ellipse([0, 0, size, size], fill=255)
-        round_icon.putalpha(mask)
-        round_path = f"{base_path}/res/mipmap-{density}/ic_launcher_round.png"
-        round_icon.save(round_path, "PNG", optimize=True)
-        
-        print(f"  ✓ {density} ({size}x{size}px) → {path}")
+    # Render the full pipeline once at the largest size; every other
+    # density is a (C-side) Lanczos resample of this master.
+    master_size = 512
+    master = draw_3d_N_icon(master_size, with_shadow=True)
     
-    # Also generate a large version for the splash screen
-    splash_icon = draw_3d_N_icon(512, with_shadow=True)
+    # Resampling and PNG encoding of every output run in parallel
     splash_path = f"{base_path}/assets/splash_icon.png"
-    splash_icon.save(splash_path, "PNG", optimize=True)
-    print(f"  ✓ splash (512x512px) → {splash_path}")
-    
-    # Feature graphic (1024x500) for Play Store
-    feature = Image.new("RGBA", (1024, 500), (11, 14, 22, 255))
-    feat_draw = ImageDraw.Draw(feature)
-    
-    # Background gradient
-    for y in range(500):
-        t = y / 500
-        r = int(11 + t * 8)
-        g = int(14 + t * 6)
-        b = int(22 + t * 12)
-        feat_draw.line([(0, y), (1024, y)], fill=(r, g, b, 255))
-    
-    # Place centered icon
-    icon_512 = draw_3d_N_icon(220)
-    ix = (1024 - 220) // 2
-    iy = (500 - 220) // 2 - 20
-    feature.alpha_composite(icon_512, (ix, iy))
-    
-    # App name text (drawn as simple rectangles representing letters)
-    feat_draw2 = ImageDraw.Draw(feature)
-    # Title bar below icon
-    text_y = iy + 240
-    feat_draw2.text = None  # no font needed, use block
-    
-    feature.save(f"{base_path}/assets/feature_graphic.png", "PNG")
-    print(f"  ✓ feature graphic → {base_path}/assets/feature_graphic.png")
+    n = len(sizes)
+    with ProcessPoolExecutor() as ex:
+        # Feature graphic (1024x500) for Play Store
+        feature = ex.submit(_render_feature_graphic, base_path, master, png_opts)
+        paths = ex.map(_render_one, sizes.keys(), sizes.values(), [base_path] * n,
+                       [master] * n, [png_opts] * n)
+        
+        # Also save the full-size master for the splash screen, encoding it
+        # here while the workers run rather than pickling it to one of them
+        master.save(splash_path, "PNG", **png_opts)
+        
+        for (density, size), path in zip(sizes.items(), paths):
+            print(f"  ✓ {density} ({size}x{size}px) → {path}")
+        print(f"  ✓ splash (512x512px) → {splash_path}")
+        print(f"  ✓ feature graphic → {feature.result()}")
 
     print("\n✅ Todos los iconos generados correctamente.")
 
 
 if __name__ == "__main__":
     import sys
-    base = sys.argv[1] if len(sys.argv) > 1 else "/home/claude/nimbuzyn"
-    generate_all_icons(base)
+    args = [a for a in sys.argv[1:] if a != "--release"]
+    base = args[0] if args else "/home/claude/nimbuzyn"
+    generate_all_icons(base, release="--release" in sys.argv[1:])